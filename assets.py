@@ -0,0 +1,135 @@
+"""Gera os arquivos estáticos com hash no nome em static/dist/.
+
+Uso: python assets.py [pasta_static]
+
+Builds anteriores não são apagados: os arquivos com hash são imutáveis e
+páginas já renderizadas (ou em cache) continuam apontando para eles. O
+manifest.json é trocado de forma atômica no fim, e o app recarrega o
+manifesto quando ele muda, sem precisar reiniciar. Arquivos de builds
+antigos podem ser removidos manualmente depois que nenhum cliente os usar.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+PASTA_DIST = 'dist'
+ARQUIVO_MANIFESTO = 'manifest.json'
+EXTENSOES_COMPRIMIVEIS = {'.css', '.js', '.svg', '.json', '.txt', '.html'}
+TAMANHO_HASH = 10
+
+# caminho do manifesto -> (mtime, conteúdo) da última leitura.
+_cache_manifestos = {}
+
+# Codificações pré-comprimidas na ordem de preferência ao servir.
+CODIFICACOES = [('br', '.br'), ('gzip', '.gz')]
+
+
+def otimizar_png(conteudo):
+    if Image is None:
+        return conteudo
+
+    imagem = Image.open(io.BytesIO(conteudo))
+    if imagem.mode not in ('RGB', 'RGBA'):
+        imagem = imagem.convert('RGBA')
+
+    # Logos e ícones têm poucas cores: uma paleta de 256 reduz o arquivo
+    # em uma ordem de grandeza sem diferença visível.
+    paleta = imagem.quantize(256, method=Image.Quantize.FASTOCTREE)
+    saida = io.BytesIO()
+    paleta.save(saida, 'PNG', optimize=True)
+    otimizado = saida.getvalue()
+    return otimizado if len(otimizado) < len(conteudo) else conteudo
+
+
+def nome_com_hash(caminho_relativo, conteudo):
+    base, extensao = os.path.splitext(caminho_relativo)
+    digest = hashlib.sha256(conteudo).hexdigest()[:TAMANHO_HASH]
+    return f'{base}.{digest}{extensao}'
+
+
+def gravar_atomico(caminho, conteudo):
+    # Grava num temporário e troca de uma vez, para que um servidor rodando
+    # nunca leia um arquivo pela metade.
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    with open(temporario, 'wb') as f:
+        f.write(conteudo)
+    os.replace(temporario, caminho)
+
+
+def gerar_assets(pasta_static):
+    pasta_dist = os.path.join(pasta_static, PASTA_DIST)
+    os.makedirs(pasta_dist, exist_ok=True)
+
+    manifesto = {}
+    for raiz, pastas, arquivos in os.walk(pasta_static):
+        if os.path.abspath(raiz) == os.path.abspath(pasta_static) and PASTA_DIST in pastas:
+            pastas.remove(PASTA_DIST)
+
+        for arquivo in sorted(arquivos):
+            caminho = os.path.join(raiz, arquivo)
+            caminho_relativo = os.path.relpath(caminho, pasta_static).replace(os.sep, '/')
+            extensao = os.path.splitext(arquivo)[1].lower()
+
+            with open(caminho, 'rb') as f:
+                conteudo = f.read()
+            if extensao == '.png':
+                conteudo = otimizar_png(conteudo)
+
+            destino_relativo = nome_com_hash(caminho_relativo, conteudo)
+            destino = os.path.join(pasta_dist, destino_relativo)
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            gravar_atomico(destino, conteudo)
+
+            if extensao in EXTENSOES_COMPRIMIVEIS:
+                gravar_atomico(destino + '.gz', gzip.compress(conteudo, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    gravar_atomico(destino + '.br', brotli.compress(conteudo, quality=11))
+
+            manifesto[caminho_relativo] = destino_relativo
+
+    gravar_atomico(os.path.join(pasta_dist, ARQUIVO_MANIFESTO),
+                   json.dumps(manifesto, indent=2, sort_keys=True).encode('utf-8'))
+
+    return manifesto
+
+
+def carregar_manifesto(pasta_static):
+    caminho = os.path.join(pasta_static, PASTA_DIST, ARQUIVO_MANIFESTO)
+    try:
+        mtime = os.stat(caminho).st_mtime_ns
+    except OSError:
+        return {}
+
+    cache = _cache_manifestos.get(caminho)
+    if cache is not None and cache[0] == mtime:
+        return cache[1]
+
+    try:
+        with open(caminho, encoding='utf-8') as f:
+            manifesto = json.load(f)
+    except (OSError, ValueError):
+        return cache[1] if cache is not None else {}
+
+    _cache_manifestos[caminho] = (mtime, manifesto)
+    return manifesto
+
+
+if __name__ == '__main__':
+    pasta = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+    gerados = gerar_assets(pasta)
+    print(f'{len(gerados)} arquivos gerados em {os.path.join(pasta, PASTA_DIST)}')
@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_from_directory, abort
 import mysql.connector
 import bcrypt
 from functools import wraps
@@ -8,15 +8,23 @@ import pandas as pd
 import numpy as np
 from ofxparse import OfxParser
 import io
+import os
+import gzip
+import mimetypes
 import unicodedata
 
-from simulador import calcular_investimento, format_currency, calcular_financiamento, locale
+from simulador import calcular_investimento, simular_investimento_monte_carlo, format_currency, calcular_financiamento, locale
+from assets import carregar_manifesto, CODIFICACOES, PASTA_DIST, ARQUIVO_MANIFESTO
 
 
 app = Flask(__name__)
 app.secret_key = 'senha'
 app.jinja_env.filters['currency'] = format_currency
 
+CACHE_ASSETS_SEGUNDOS = 365 * 24 * 60 * 60
+MIMETYPES_COMPRIMIVEIS = {'text/html', 'application/json'}
+TAMANHO_MINIMO_COMPRESSAO = 500
+
 db_config = {
     'host': 'localhost',
     'user': 'root',
@@ -69,6 +77,54 @@ def categorize(description):
     return 'Outros'
 
 
+@app.template_global()
+def asset_url(filename):
+    nome = carregar_manifesto(app.static_folder).get(filename)
+    if nome is None:
+        return url_for('static', filename=filename)
+    return url_for('asset', filename=nome)
+
+@app.route('/assets/<path:filename>')
+def asset(filename):
+    # Qualquer build já gerado continua servível: páginas antigas ainda
+    # referenciam os nomes com hash anteriores.
+    if os.path.basename(filename) == ARQUIVO_MANIFESTO:
+        abort(404)
+
+    pasta_dist = os.path.join(app.static_folder, PASTA_DIST)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    arquivo, codificacao = filename, None
+    for nome_codificacao, extensao in CODIFICACOES:
+        if request.accept_encodings.quality(nome_codificacao) > 0 and os.path.isfile(os.path.join(pasta_dist, filename + extensao)):
+            arquivo, codificacao = filename + extensao, nome_codificacao
+            break
+
+    response = send_from_directory(pasta_dist, arquivo, mimetype=mimetype, max_age=CACHE_ASSETS_SEGUNDOS)
+    if codificacao:
+        response.headers['Content-Encoding'] = codificacao
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+@app.after_request
+def comprimir_resposta(response):
+    if (response.mimetype not in MIMETYPES_COMPRIMIVEIS or response.status_code != 200
+            or response.direct_passthrough or 'Content-Encoding' in response.headers):
+        return response
+
+    corpo = response.get_data()
+    if request.accept_encodings.quality('gzip') > 0 and len(corpo) >= TAMANHO_MINIMO_COMPRESSAO:
+        # mtime=0 deixa o gzip determinístico, então o ETag não muda entre requisições.
+        response.set_data(gzip.compress(corpo, compresslevel=6, mtime=0))
+        response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.add_etag()
+    return response.make_conditional(request)
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -512,31 +568,80 @@ def simular_financiamento():
                            user_name=session.get('user_name'),
                            resultados=resultados)
 
+MAX_CAMINHOS_MONTE_CARLO = 20000
+MAX_PRAZO_MONTE_CARLO = 600
+
+def ler_parametros_monte_carlo(dados):
+    retornos_historicos = dados.get('retornos_historicos') or None
+    if isinstance(retornos_historicos, str):
+        retornos_historicos = [float(r.replace(',', '.')) for r in retornos_historicos.replace(';', ' ').split()]
+
+    semente = dados.get('semente')
+    num_caminhos = int(dados.get('num_caminhos') or 10000)
+    if num_caminhos > MAX_CAMINHOS_MONTE_CARLO:
+        raise ValueError(f'o número de caminhos deve ser no máximo {MAX_CAMINHOS_MONTE_CARLO}')
+    prazo_meses = int(dados['prazo'])
+    if prazo_meses > MAX_PRAZO_MONTE_CARLO:
+        raise ValueError(f'o prazo deve ser de no máximo {MAX_PRAZO_MONTE_CARLO} meses')
+
+    return {
+        'investimento_inicial': float(dados['investimento_inicial']),
+        'aporte_mensal': float(dados['aporte_mensal']),
+        'taxa_anual': float(dados.get('rentabilidade') or 0),
+        'prazo_meses': prazo_meses,
+        'volatilidade_anual': float(dados.get('volatilidade') or 0),
+        'distribuicao': dados.get('distribuicao') or 'normal',
+        'retornos_historicos': retornos_historicos,
+        'num_caminhos': num_caminhos,
+        'semente': int(semente) if semente not in (None, '') else None
+    }
+
 @app.route('/simulador/investimento', methods=['GET', 'POST'])
 @login_required
 def simular_investimento():
     
     resultados = None
+    modo = 'deterministico'
+    parametros = {}
     if request.method == 'POST':
+        modo = request.form.get('modo', 'deterministico')
         try:
-            investimento_inicial = float(request.form['investimento_inicial'])
-            aporte_mensal = float(request.form['aporte_mensal'])
-            rentabilidade = float(request.form['rentabilidade'])
-            prazo = int(request.form['prazo'])
-
-            resultados = calcular_investimento(
-                investimento_inicial=investimento_inicial,
-                aporte_mensal=aporte_mensal,
-                taxa_anual=rentabilidade,
-                prazo_meses=prazo
-            )
+            if modo == 'monte_carlo':
+                parametros = ler_parametros_monte_carlo(request.form)
+                resultados = simular_investimento_monte_carlo(**parametros)
+            else:
+                investimento_inicial = float(request.form['investimento_inicial'])
+                aporte_mensal = float(request.form['aporte_mensal'])
+                rentabilidade = float(request.form['rentabilidade'])
+                prazo = int(request.form['prazo'])
+
+                resultados = calcular_investimento(
+                    investimento_inicial=investimento_inicial,
+                    aporte_mensal=aporte_mensal,
+                    taxa_anual=rentabilidade,
+                    prazo_meses=prazo
+                )
         except (ValueError, KeyError) as e:
             flash(f'Erro nos dados de entrada: {e}. Por favor, preencha todos os campos corretamente.', 'error')
             return redirect(url_for('simular_investimento'))
 
     return render_template('simular-investimento.html',
                            user_name=session.get('user_name'),
-                           resultados=resultados)
+                           resultados=resultados,
+                           modo=modo,
+                           parametros=parametros)
+
+@app.route('/simulador/investimento/monte_carlo', methods=['POST'])
+@login_required
+def simular_investimento_monte_carlo_json():
+    dados = request.get_json(silent=True) or request.form
+    if not isinstance(dados, dict):
+        return jsonify({'erro': 'Erro nos dados de entrada: o corpo deve ser um objeto JSON'}), 400
+    try:
+        resultados = simular_investimento_monte_carlo(**ler_parametros_monte_carlo(dados))
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({'erro': f'Erro nos dados de entrada: {e}'}), 400
+    return jsonify(resultados)
 
 @app.route('/excluir_conta')
 @login_required
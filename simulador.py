@@ -1,5 +1,7 @@
 import locale
 
+import numpy as np
+
 
 try:
     locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
@@ -62,6 +64,99 @@ def calcular_investimento(investimento_inicial, aporte_mensal, taxa_anual, prazo
 
     return {'mensal': dados_mensais, 'resumo': resumo}
 
+def _aliquotas_ir(prazo_meses):
+    # Mesma tabela regressiva de calcular_investimento, vetorizada por mês.
+    dias = np.arange(1, prazo_meses + 1) * 30
+    return np.select(
+        [dias <= 180, dias <= 360, dias <= 720],
+        [0.225, 0.20, 0.175],
+        default=0.15
+    )
+
+def simular_investimento_monte_carlo(investimento_inicial, aporte_mensal, taxa_anual, prazo_meses,
+                                     volatilidade_anual=0.0, distribuicao='normal',
+                                     retornos_historicos=None, num_caminhos=10000, semente=None):
+
+    if prazo_meses <= 0:
+        raise ValueError('o prazo deve ser de pelo menos 1 mês')
+    if num_caminhos <= 0:
+        raise ValueError('o número de caminhos deve ser positivo')
+    if volatilidade_anual < 0:
+        raise ValueError('a volatilidade não pode ser negativa')
+
+    rng = np.random.default_rng(semente)
+    taxa_mensal = (taxa_anual / 100) / 12
+    vol_mensal = (volatilidade_anual / 100) / np.sqrt(12)
+    forma = (prazo_meses, num_caminhos)
+
+    if distribuicao == 'normal':
+        retornos = rng.normal(taxa_mensal, vol_mensal, size=forma)
+    elif distribuicao == 'lognormal':
+        # Média do retorno bruto preservada em 1 + taxa_mensal.
+        mu = np.log1p(taxa_mensal) - vol_mensal ** 2 / 2
+        retornos = np.expm1(rng.normal(mu, vol_mensal, size=forma))
+    elif distribuicao == 'bootstrap':
+        historico = np.asarray(retornos_historicos if retornos_historicos is not None else [], dtype=float)
+        if historico.size == 0:
+            raise ValueError('informe a série de retornos mensais para o bootstrap')
+        retornos = rng.choice(historico / 100, size=forma)
+    else:
+        raise ValueError(f'distribuição desconhecida: {distribuicao}')
+
+    # Na normal um mês não pode perder mais que 100% do montante.
+    np.maximum(retornos, -1.0, out=retornos)
+    retornos += 1.0
+
+    # Mesma ordem de calcular_investimento: aporte a partir do 2º mês, depois
+    # rendimento. A matriz de fatores é reaproveitada para guardar os montantes.
+    montantes_brutos = retornos
+    montante = np.full(num_caminhos, float(investimento_inicial))
+    for i in range(prazo_meses):
+        if i > 0:
+            montante += aporte_mensal
+        montante *= retornos[i]
+        montantes_brutos[i] = montante
+
+    total_investido = investimento_inicial + aporte_mensal * np.arange(prazo_meses)
+    aliquotas = _aliquotas_ir(prazo_meses)
+
+    # O líquido é função monótona do bruto em cada mês, então os percentis do
+    # líquido saem dos percentis do bruto sem ordenar uma segunda matriz.
+    def _liquido(bruto):
+        return bruto - np.maximum(bruto - total_investido, 0) * aliquotas
+
+    p5, p50, p95 = np.percentile(montantes_brutos, [5, 50, 95], axis=1)
+    liquido_p5, liquido_p50, liquido_p95 = _liquido(p5), _liquido(p50), _liquido(p95)
+
+    dados_mensais = []
+    for i in range(prazo_meses):
+        dados_mensais.append({
+            'mes': i + 1,
+            'total_investido': float(total_investido[i]),
+            'bruto_p5': float(p5[i]),
+            'bruto_p50': float(p50[i]),
+            'bruto_p95': float(p95[i]),
+            'liquido_p5': float(liquido_p5[i]),
+            'liquido_p50': float(liquido_p50[i]),
+            'liquido_p95': float(liquido_p95[i])
+        })
+
+    bruto_final = montantes_brutos[-1]
+    liquido_final = bruto_final - np.maximum(bruto_final - total_investido[-1], 0) * aliquotas[-1]
+
+    resumo = {
+        'total_investido': float(total_investido[-1]),
+        'valor_final_liquido_p5': float(liquido_p5[-1]),
+        'valor_final_liquido_p50': float(liquido_p50[-1]),
+        'valor_final_liquido_p95': float(liquido_p95[-1]),
+        'probabilidade_perda': float(np.mean(liquido_final < total_investido[-1])),
+        'num_caminhos': num_caminhos,
+        'distribuicao': distribuicao,
+        'semente': semente
+    }
+
+    return {'mensal': dados_mensais, 'resumo': resumo}
+
 def format_currency(value):
     return locale.currency(value, grouping=True)
 